@@ -1,24 +1,176 @@
 from src.location import (
     Pos,
+    Orientation,
     Label
 )
 
 
+# Snapshot layout: header, then one record per scent. -1 stands in for None (no TTL / no expiry).
+# Kept as format strings, as struct (like heapq) is only imported where it is used: the command line start
+# up needs neither.
+SNAPSHOT_MAGIC = b'RMG1'
+SNAPSHOT_HEADER = '<4sqqqqqqI'  # magic, extents x y, ttl robots ticks, robot/tick counts, scents.
+SNAPSHOT_SCENT = '<qqbbqqqqq'  # x, y, facing, at edge, hits, expires at robot/tick, pending ttl robots/ticks.
+
+# Rough in-memory cost of a Grid, of each scent on it (key, Label and Orientation), and of each TTL entry
+# waiting to be scheduled, or scheduled in an expiry heap.
+GRID_ESTIMATED_BYTES = 512
+SCENT_ESTIMATED_BYTES = 176
+PENDING_EXPIRY_ESTIMATED_BYTES = 80
+HEAP_EXPIRY_ESTIMATED_BYTES = 112
+
+# An expiry heap is rebuilt once its entries for replaced or expired scents outnumber the scents themselves.
+EXPIRY_HEAP_SLACK = 16
+
+
 class Grid(object):
 
-    def __init__(self, grid_extents: Pos):
+    def __init__(self, grid_extents: Pos, scent_ttl_robots=None, scent_ttl_ticks=None):
+        Grid.__check_ttls(scent_ttl_robots, scent_ttl_ticks)
         self.grid_extents = grid_extents
         self.labels = {}
+        # Set once any scent is left where moving forward would not leave the grid. Robots left by the engine
+        # only ever leave scents at outward edges, so until then a scent only needs checking at the edge.
+        self.has_inner_scents = False
+        # Scents last forever by default; otherwise for this many robots, or simulated ticks (instructions),
+        # counted from the end of the robot that left them. Expired scents are dropped between robots, in
+        # advance(); within a robot, the engine also ignores scents whose tick expiry it has reached.
+        self.scent_ttl_robots = scent_ttl_robots
+        self.scent_ttl_ticks = scent_ttl_ticks
+        self.robot_count = 0
+        self.tick_count = 0
+        self.__pending_expiries = []
+        # Min-heaps of (expires_at, seq, key, label); seq breaks ties, as labels do not compare.
+        self.__robot_expiries = []
+        self.__tick_expiries = []
+        self.__expiry_seq = 0
+
+    def __check_ttls(ttl_robots, ttl_ticks):
+        # Negative TTLs make no sense, and -1 stands for None in snapshots.
+        for ttl in (ttl_robots, ttl_ticks):
+            if ttl is not None and ttl < 0:
+                raise ValueError(f'Scent time-to-live must be 0 or more, not {ttl}.')
 
     def __make_label_key(pos: Pos):
         return f'{pos.coord_x},{pos.coord_y}'
 
-    def add_scent(self, pos: Pos, label: Label):
-        self.labels[Grid.__make_label_key(pos)] = label
+    def __note_inner_scent(self, pos: Pos, label: Label):
+        if label.is_scent_at_edge and self.is_within_grid(label.orientation.next_forward_position(pos)):
+            self.has_inner_scents = True
+
+    def add_scent(self, pos: Pos, label: Label, ttl_robots=None, ttl_ticks=None):
+        Grid.__check_ttls(ttl_robots, ttl_ticks)
+        key = Grid.__make_label_key(pos)
+        self.labels[key] = label
+        self.__note_inner_scent(pos, label)
+        ttl_robots = self.scent_ttl_robots if ttl_robots is None else ttl_robots
+        ttl_ticks = self.scent_ttl_ticks if ttl_ticks is None else ttl_ticks
+        if ttl_robots is not None or ttl_ticks is not None:
+            self.__pending_expiries.append((key, label, ttl_robots, ttl_ticks))
 
     def get_scent(self, pos: Pos):
         return self.labels.get(Grid.__make_label_key(pos))
 
+    def __push_expiry(self, expiries, expires_at, key, label):
+        import heapq
+        self.__expiry_seq += 1
+        heapq.heappush(expiries, (expires_at, self.__expiry_seq, key, label))
+
+    def __expire(self, expiries, now):
+        import heapq
+        while expiries and expiries[0][0] <= now:
+            (_, _, key, label) = heapq.heappop(expiries)
+            # Skip entries for scents since replaced, or already expired through their other TTL.
+            if self.labels.get(key) is label:
+                del self.labels[key]
+
+    def __compact(self, expiries):
+        # Scents replaced, at the same cell, before they expire leave stale entries behind; without this,
+        # a cell rescented often under a long TTL would grow its heap without bound.
+        if len(expiries) > 2 * len(self.labels) + EXPIRY_HEAP_SLACK:
+            import heapq
+            expiries[:] = [entry for entry in expiries if self.labels.get(entry[2]) is entry[3]]
+            heapq.heapify(expiries)
+
+    def advance(self, robots=1, ticks=0):
+        self.robot_count += robots
+        self.tick_count += ticks
+        if not (self.__pending_expiries or self.__robot_expiries or self.__tick_expiries):
+            return
+        for (key, label, ttl_robots, ttl_ticks) in self.__pending_expiries:
+            if ttl_robots is not None:
+                self.__push_expiry(self.__robot_expiries, self.robot_count + ttl_robots, key, label)
+            if ttl_ticks is not None:
+                label.expires_at_tick = self.tick_count + ttl_ticks
+                self.__push_expiry(self.__tick_expiries, label.expires_at_tick, key, label)
+        self.__pending_expiries.clear()
+        self.__expire(self.__robot_expiries, self.robot_count)
+        self.__expire(self.__tick_expiries, self.tick_count)
+        self.__compact(self.__robot_expiries)
+        self.__compact(self.__tick_expiries)
+
+    def estimated_bytes(self):
+        return (
+            GRID_ESTIMATED_BYTES + SCENT_ESTIMATED_BYTES * len(self.labels) +
+            PENDING_EXPIRY_ESTIMATED_BYTES * len(self.__pending_expiries) +
+            HEAP_EXPIRY_ESTIMATED_BYTES * (len(self.__robot_expiries) + len(self.__tick_expiries))
+        )
+
+    def __scent_expiries(self):
+        expiries = {}
+        for (heap_idx, expiries_heap) in enumerate((self.__robot_expiries, self.__tick_expiries)):
+            for (expires_at, _, key, label) in expiries_heap:
+                if self.labels.get(key) is label:
+                    expiries.setdefault(key, [-1, -1, -1, -1])[heap_idx] = expires_at
+        for (key, label, ttl_robots, ttl_ticks) in self.__pending_expiries:
+            if self.labels.get(key) is label:
+                pending = expiries.setdefault(key, [-1, -1, -1, -1])
+                pending[2] = -1 if ttl_robots is None else ttl_robots
+                pending[3] = -1 if ttl_ticks is None else ttl_ticks
+        return expiries
+
+    def to_bytes(self):
+        import struct
+        none_as = (lambda value: -1 if value is None else value)
+        expiries = self.__scent_expiries()
+        parts = [struct.pack(
+            SNAPSHOT_HEADER, SNAPSHOT_MAGIC, self.grid_extents.coord_x, self.grid_extents.coord_y,
+            none_as(self.scent_ttl_robots), none_as(self.scent_ttl_ticks), self.robot_count, self.tick_count, len(self.labels))]
+        for (key, label) in self.labels.items():
+            (coord_x, coord_y) = key.split(',')
+            parts.append(struct.pack(
+                SNAPSHOT_SCENT,                 int(coord_x), int(coord_y), label.orientation.get_orientation_int(), label.is_scent_at_edge, label.hits,
+                *expiries.get(key, (-1, -1, -1, -1))))
+        return b''.join(parts)
+
+    def from_bytes(data):
+        import struct
+        as_none = (lambda value: None if value == -1 else value)
+        (magic, extent_x, extent_y, ttl_robots, ttl_ticks, robot_count, tick_count, num_scents) = struct.unpack_from(SNAPSHOT_HEADER, data)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError('Not a grid snapshot.')
+        grid = Grid(Pos(extent_x, extent_y), as_none(ttl_robots), as_none(ttl_ticks))
+        grid.robot_count = robot_count
+        grid.tick_count = tick_count
+        header_size = struct.calcsize(SNAPSHOT_HEADER)
+        scents_size = num_scents * struct.calcsize(SNAPSHOT_SCENT)
+        for scent_fields in struct.iter_unpack(SNAPSHOT_SCENT, data[header_size:header_size + scents_size]):
+            (coord_x, coord_y, facing, is_scent_at_edge, hits, expires_robot, expires_tick, pending_robots, pending_ticks) = scent_fields
+            label = Label(Orientation(Orientation.FacingMap_NumKeys[facing]), bool(is_scent_at_edge))
+            label.hits = hits
+            pos = Pos(coord_x, coord_y)
+            key = Grid.__make_label_key(pos)
+            grid.labels[key] = label
+            grid.__note_inner_scent(pos, label)
+            if expires_robot != -1:
+                grid.__push_expiry(grid.__robot_expiries, expires_robot, key, label)
+            if expires_tick != -1:
+                label.expires_at_tick = expires_tick
+                grid.__push_expiry(grid.__tick_expiries, expires_tick, key, label)
+            if pending_robots != -1 or pending_ticks != -1:
+                grid.__pending_expiries.append((key, label, as_none(pending_robots), as_none(pending_ticks)))
+        return grid
+
     def is_within_grid(self, pos: Pos):
         return (
             pos.coord_x >= 0 and pos.coord_x <= self.grid_extents.coord_x and
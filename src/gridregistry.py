@@ -0,0 +1,98 @@
+import os
+from collections import OrderedDict
+from urllib.parse import quote
+
+from src.grid import Grid
+
+
+class GridRegistry(object):
+    # Keeps the most recently used grids in memory, within memory_budget_bytes, and the rest as snapshots
+    # in snapshot_dir, reloaded on demand. A grid returned by get() may be evicted, and so stop being the
+    # registered copy, on any later get() or put(): fetch it again rather than holding on to it.
+
+    SNAPSHOT_SUFFIX = '.grid'
+
+    def __init__(self, snapshot_dir, memory_budget_bytes):
+        self.snapshot_dir = snapshot_dir
+        self.memory_budget_bytes = memory_budget_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__resident_bytes = 0
+        # grid_id -> [grid, estimated bytes], least recently used first.
+        self.__hot = OrderedDict()
+        os.makedirs(snapshot_dir, exist_ok=True)
+
+    @property
+    def resident_bytes(self):
+        self.__refresh_most_recent_estimate()
+        return self.__resident_bytes
+
+    @property
+    def resident_grids(self):
+        return len(self.__hot)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __snapshot_path(self, grid_id):
+        return os.path.join(self.snapshot_dir, quote(str(grid_id), safe='') + GridRegistry.SNAPSHOT_SUFFIX)
+
+    def __write_snapshot(self, grid_id, grid):
+        path = self.__snapshot_path(grid_id)
+        with open(path + '.tmp', 'wb') as fl:
+            fl.write(grid.to_bytes())
+        os.replace(path + '.tmp', path)
+
+    def __refresh_most_recent_estimate(self):
+        # Callers add scents to the grid they last fetched, so that is the estimate most likely to be stale.
+        if self.__hot:
+            entry = next(reversed(self.__hot.values()))
+            estimate = entry[0].estimated_bytes()
+            self.__resident_bytes += estimate - entry[1]
+            entry[1] = estimate
+
+    def __make_resident(self, grid_id, grid):
+        estimate = grid.estimated_bytes()
+        self.__hot[grid_id] = [grid, estimate]
+        self.__resident_bytes += estimate
+        # The grid just made resident stays, even if it alone is over budget.
+        while self.__resident_bytes > self.memory_budget_bytes and len(self.__hot) > 1:
+            (evicted_id, (evicted_grid, evicted_estimate)) = self.__hot.popitem(last=False)
+            self.__resident_bytes -= evicted_estimate
+            self.__write_snapshot(evicted_id, evicted_grid)
+            self.evictions += 1
+
+    def __contains__(self, grid_id):
+        return grid_id in self.__hot or os.path.isfile(self.__snapshot_path(grid_id))
+
+    def put(self, grid_id, grid: Grid):
+        self.__refresh_most_recent_estimate()
+        entry = self.__hot.pop(grid_id, None)
+        if entry is not None:
+            self.__resident_bytes -= entry[1]
+        self.__make_resident(grid_id, grid)
+
+    def get(self, grid_id):
+        self.__refresh_most_recent_estimate()
+        entry = self.__hot.get(grid_id)
+        if entry is not None:
+            self.hits += 1
+            self.__hot.move_to_end(grid_id)
+            return entry[0]
+        try:
+            with open(self.__snapshot_path(grid_id), 'rb') as fl:
+                grid = Grid.from_bytes(fl.read())
+        except FileNotFoundError:
+            raise KeyError(grid_id)
+        self.misses += 1
+        self.__make_resident(grid_id, grid)
+        return grid
+
+    def flush(self):
+        # Writes every resident grid to its snapshot, keeping them resident.
+        self.__refresh_most_recent_estimate()
+        for (grid_id, (grid, _)) in self.__hot.items():
+            self.__write_snapshot(grid_id, grid)
@@ -1,5 +1,4 @@
 import os
-import re
 
 from src.location import (
     Pos,
@@ -61,27 +60,35 @@ class Start(Operation):
 
 class TurnRight(Operation):
     def do(self, _: Grid, robot: Robot):
+        robot.add_tick()
         robot.set_orientation(robot.orientation.new_orientation_90_clockwise())
 
 
 class TurnLeft(Operation):
     def do(self, _: Grid, robot: Robot):
+        robot.add_tick()
         robot.set_orientation(robot.orientation.new_orientation_90_anticlockwise())
 
 
 class MoveForward(Operation):
 
-    def __to_dropoff(grid, pos, orientation):
+    def __to_dropoff(grid, pos, orientation, tick):
         label = grid.get_scent(pos)
-        return label and label.is_next_drop(orientation)
+        if label and label.is_next_drop(orientation) and not label.is_expired_at(tick):
+            label.hits += 1
+            return True
+        return False
 
     def do(self, grid: Grid, robot: Robot):
         if robot.is_lost:
             raise Exception('Dead')
         orientation = robot.orientation
         current_pos = robot.position
+        # As in simulate(), a scent's tick expiry is checked at the tick of the move.
+        tick = grid.tick_count + robot.ticks
+        robot.add_tick()
         # Ignore instruction if known bad place.
-        if MoveForward.__to_dropoff(grid, current_pos, orientation):
+        if MoveForward.__to_dropoff(grid, current_pos, orientation, tick):
             return
         next_position = orientation.next_forward_position(current_pos)
         if grid.is_within_grid(next_position):
@@ -98,13 +105,32 @@ class Instructions(object):
         'L': TurnLeft,
         'F': MoveForward
     }
+    Instructions_Delete_Table = str.maketrans('', '', ''.join(Instructions_Available.keys()))
 
     def __init__(self, instruction_list):
         self.instruction_list = instruction_list
 
+    def run(self, grid: Grid, robot: Robot):
+        # Runs the instructions until the robot is lost, then moves the grid on past the robot, as simulate() does,
+        # for scents to expire.
+        for inst in self.instruction_list:
+            inst.do(grid, robot)
+            if robot.is_lost:
+                break
+        grid.advance(ticks=robot.ticks)
+
     def get_instructions_keys():
         return Instructions.Instructions_Available.keys()
 
+    def find_unrecognised_instruction(instructions):
+        # Returns (index, character) of the first character that is not an instruction, or None.
+        # Anything left once the instruction characters are deleted is unrecognised, so valid strings skip the loop.
+        if instructions.translate(Instructions.Instructions_Delete_Table):
+            for idx, a_char in enumerate(instructions):
+                if a_char not in Instructions.get_instructions_keys():
+                    return (idx, a_char)
+        return None
+
     def create_instruction(ch):
         op = None
         OpClass = Instructions.Instructions_Available.get(ch)
@@ -121,11 +147,26 @@ class Instructions(object):
         return retstring
 
 
+class ValidatedInstructionChunks(object):
+    # Chunks of an instructions line, already validated by InstructionsFile, so not to be validated again.
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __iter__(self):
+        return self.chunks
+
+
 class InstructionsFile(object):
 
-    RE_POSITION = r'\s*(\d+)\s+(\d+)\s*'
-    RE_Grid_Max = re.compile(r'^'+RE_POSITION+r'$')
-    RE_Start_State = re.compile(r'^'+RE_POSITION+r'\s([NSEW])\s*$')
+    # Lines are split rather than matched with regexes, so that re need not be imported at start up.
+    # Same as matching r'^\s*(\d+)\s+(\d+)\s*$' (grid) and r'^\s*(\d+)\s+(\d+)\s+([NSEW])\s*$' (start state).
+    def split_position_fields(line, num_fields):
+        fields = line.split()
+        if len(fields) != num_fields or not (fields[0].isdecimal() and fields[1].isdecimal()):
+            return None
+        return fields
+
+    INSTRUCTIONS_CHUNK_SIZE = 64 * 1024
 
     def __init__(self, path):
         self.file_path = path
@@ -133,6 +174,8 @@ class InstructionsFile(object):
         self.file_line_num = 0
         self.__grid_extents = None
         self.is_EOF = False
+        self.__is_line_complete = True
+        self.__chunked_mission_num = 0
 
     @property
     def grid_extents(self):
@@ -159,13 +202,34 @@ class InstructionsFile(object):
             next_line = next_line.strip('\n')
         return next_line
 
+    def __read_next_chunk_of_line_from_file(self, chunk_size):
+        # Never reads past the end of the current line, nor more than chunk_size characters of it.
+        if self.__is_line_complete:
+            self.__is_line_complete = False
+            chunk = self.file.readline(chunk_size)
+            if not chunk:
+                self.is_EOF = True
+                self.__is_line_complete = True
+                return chunk
+            self.file_line_num += 1
+        else:
+            chunk = self.file.readline(chunk_size)
+        if not chunk or chunk.endswith('\n'):
+            self.__is_line_complete = True
+            chunk = chunk.strip('\n')
+        return chunk
+
+    def __skip_rest_of_line(self, chunk_size):
+        while not self.__is_line_complete:
+            self.__read_next_chunk_of_line_from_file(chunk_size)
+
     def __set_grid_extents(self, gridext_line):
-        match = InstructionsFile.RE_Grid_Max.match(gridext_line)
-        if match is None:
+        fields = InstructionsFile.split_position_fields(gridext_line, 2)
+        if fields is None:
             raise ExceptionFileParseCritical(
                 ExceptionFileParseCritical.CODE_MISSING_GRID_MAX, ERROR_MSG_MISSING_GRID_MAX,
                 self.file_path, self.file_line_num, gridext_line)
-        self.__grid_extents = Pos(int(match[1]), int(match[2]))
+        self.__grid_extents = Pos(int(fields[0]), int(fields[1]))
 
     def __look_ahead_for_next_line(self):
         look_ahead_line = self.__read_next_line_from_file()
@@ -195,25 +259,41 @@ class InstructionsFile(object):
         return line
 
     def __make_start_position_or_raise(self, line_one):
-        match = InstructionsFile.RE_Start_State.match(line_one)
-        if match is None:
+        fields = InstructionsFile.split_position_fields(line_one, 3)
+        if fields is None or fields[2] not in Orientation.FacingMap_CharKeys:
             raise ExceptionFileParseCritical(
                 ExceptionFileParseCritical.CODE_ROBOT_POSITION_AND_DIRECTION_NOT_RECOGNISED, ERROR_MSG_ROBOT_POSITION_AND_DIRECTION_NOT_RECOGNISED,
                 self.file_path, self.file_line_num, line_one)
-        pos = Pos(int(match[1]), int(match[2]))
-        direction_char = match[3]
+        pos = Pos(int(fields[0]), int(fields[1]))
+        direction_char = fields[2]
         direction = Orientation(direction_char)
         return (pos, direction)
 
+    def __validate_instructions_or_raise(self, instructions, chunk_offset=0):
+        unrecognised = Instructions.find_unrecognised_instruction(instructions)
+        if unrecognised:
+            (idx, a_char) = unrecognised
+            raise ExceptionFileParseCritical(
+                ExceptionFileParseCritical.CODE_ROBOT_INSTRUCTIONS_NOT_RECOGNISED, ERROR_MSG_ROBOT_INSTRUCTIONS_NOT_RECOGNISED,
+                self.file_path, self.file_line_num, f'Character "{a_char}" at position {chunk_offset + idx}')
+
+    def __instructions_chunks(self, first_chunk, chunk_size, mission_num):
+        # first_chunk is validated by the caller; the rest of the line is validated as it is read.
+        chunk = first_chunk
+        chunk_offset = 0
+        while chunk:
+            yield chunk
+            if mission_num != self.__chunked_mission_num or self.__is_line_complete:
+                return
+            chunk_offset += len(chunk)
+            chunk = self.__read_next_chunk_of_line_from_file(chunk_size)
+            self.__validate_instructions_or_raise(chunk, chunk_offset)
+
     def __make_instructions_list(self, start_pos, start_direction, instructions_string):
         instructions_list = []
         start_state = Start(start_pos, start_direction)
         instructions_list.append(start_state)
-        for idx, a_char in enumerate(instructions_string):
-            if a_char not in Instructions.get_instructions_keys():
-                raise ExceptionFileParseCritical(
-                    ExceptionFileParseCritical.CODE_ROBOT_INSTRUCTIONS_NOT_RECOGNISED, ERROR_MSG_ROBOT_INSTRUCTIONS_NOT_RECOGNISED,
-                    self.file_path, self.file_line_num, f'Character "{a_char}" at position {idx}')
+        for a_char in instructions_string:
             an_inst = Instructions.create_instruction(a_char)
             instructions_list.append(an_inst)
         return instructions_list
@@ -223,15 +303,41 @@ class InstructionsFile(object):
         first_line = self.__read_next_line_from_file()
         self.__set_grid_extents(first_line)
 
-    def next_instructions(self):
+    def next_missions(self):
+        # Yields validated (x, y, heading, instructions_string) tuples, without building Operation objects.
         line_one = self.__first_ever_line_of_instructions_or_raise()
         while line_one:
             (pos, direction) = self.__make_start_position_or_raise(line_one)
 
             line_two = self.__next_line_raise_if_missing_instructions()
-            instructions_list = self.__make_instructions_list(pos, direction, line_two)
+            self.__validate_instructions_or_raise(line_two)
+            yield (pos.coord_x, pos.coord_y, direction.get_orientation(), line_two)
+
+            line_one = self.__next_line_raise_if_missing_instructions(next_instruction_expected=True)
+
+    def next_missions_chunked(self, chunk_size=None):
+        # As next_missions(), but the instructions are a generator of validated chunks of the line, read on demand.
+        # Whatever of a line the consumer has not pulled by the next mission is skipped, unparsed.
+        chunk_size = chunk_size or InstructionsFile.INSTRUCTIONS_CHUNK_SIZE
+        line_one = self.__first_ever_line_of_instructions_or_raise()
+        while line_one:
+            (pos, direction) = self.__make_start_position_or_raise(line_one)
 
-            instructions = Instructions(instructions_list)
-            yield instructions
+            first_chunk = self.__read_next_chunk_of_line_from_file(chunk_size)
+            if not first_chunk:
+                raise ExceptionFileParseCritical(
+                    ExceptionFileParseCritical.CODE_ROBOT_INSTRUCTIONS_MISSING, ERROR_MSG_ROBOT_INSTRUCTIONS_MISSING,
+                    self.file_path, self.file_line_num, first_chunk)
+            # Validated here, as it has been read already, even if the robot is lost before pulling it.
+            self.__validate_instructions_or_raise(first_chunk)
+            chunks = ValidatedInstructionChunks(self.__instructions_chunks(first_chunk, chunk_size, self.__chunked_mission_num))
+            yield (pos.coord_x, pos.coord_y, direction.get_orientation(), chunks)
+            self.__chunked_mission_num += 1
+            self.__skip_rest_of_line(chunk_size)
 
             line_one = self.__next_line_raise_if_missing_instructions(next_instruction_expected=True)
+
+    def next_instructions(self):
+        for (coord_x, coord_y, heading, instructions_string) in self.next_missions():
+            instructions_list = self.__make_instructions_list(Pos(coord_x, coord_y), Orientation(heading), instructions_string)
+            yield Instructions(instructions_list)
@@ -1,4 +1,5 @@
 class Pos(object):
+    __slots__ = ('coord_x', 'coord_y')
 
     def __init__(self, coord_x, coord_y):
         self.coord_x = coord_x
@@ -6,6 +7,8 @@ class Pos(object):
 
 
 class Orientation(object):
+    __slots__ = ('facing',)
+
     FACING_NORTH = ('N', 0)
     FACING_EAST = ('E', 1)
     FACING_SOUTH = ('S', 2)
@@ -57,10 +60,18 @@ class Orientation(object):
 
 
 class Label(object):
+    __slots__ = ('is_scent_at_edge', 'orientation', 'hits', 'expires_at_tick')
 
     def __init__(self, orientation: Orientation, is_scent_at_edge=True):
         self.is_scent_at_edge = is_scent_at_edge
         self.orientation = orientation
+        # Times this scent has stopped a robot from being lost.
+        self.hits = 0
+        # Set by Grid for scents with a tick time-to-live.
+        self.expires_at_tick = None
+
+    def is_expired_at(self, tick):
+        return self.expires_at_tick is not None and self.expires_at_tick <= tick
 
     def is_next_drop(self, orientation: Orientation):
         return (
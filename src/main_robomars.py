@@ -1,47 +1,145 @@
-from argparse import (ArgumentParser, ArgumentTypeError)
+import sys
 
 from src.instructionfile import (
     InstructionsFile,
     ExceptionFileParseCritical
 )
 from src.grid import Grid
-from src.robot import Robot
+from src.simulate import simulate
 
 
 class MainExec(object):
 
     class ParsedArgs(object):
-        def __init__(self, infile):
+        def __init__(self, infile, outcome_map_instructions=None, profile_dir=None, profile_mode=None, profile_interval=None,
+                     scent_ttl_robots=None, scent_ttl_ticks=None):
             self.input_file = infile
+            self.outcome_map_instructions = outcome_map_instructions
+            self.profile_dir = profile_dir
+            self.profile_mode = profile_mode
+            self.profile_interval = profile_interval
+            self.scent_ttl_robots = scent_ttl_robots
+            self.scent_ttl_ticks = scent_ttl_ticks
+
+    class NoProfiler(object):
+        def phase(self, _):
+            return self
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_):
+            return False
+
+        def write(self):
+            return []
+
+    # Copies of profiling.PROFILE_MODES and DEFAULT_SAMPLE_INTERVAL, so that building the argument parser does
+    # not load src.profiling (and with it cProfile and threading); tests check they match.
+    PROFILE_MODES = ('cprofile', 'sample')
+    DEFAULT_PROFILE_INTERVAL = 0.005
+
+    def non_negative_int(value):
+        from argparse import ArgumentTypeError
+        try:
+            number = int(value)
+        except ValueError:
+            number = -1
+        if number < 0:
+            raise ArgumentTypeError(f'"{value}" is not a whole number, 0 or more.')
+        return number
+
+    def positive_float(value):
+        from argparse import ArgumentTypeError
+        try:
+            number = float(value)
+        except ValueError:
+            number = 0.0
+        if not number > 0:
+            raise ArgumentTypeError(f'"{value}" is not a number more than 0.')
+        return number
 
     def buildArgParser(self):
+        from argparse import ArgumentParser
         argParser = ArgumentParser(description='Robot instructions.')
         argParser.add_argument(
             'input_file', default=None,  # nargs=None,
             help='Path of file containing robot instructions.')
+        argParser.add_argument(
+            '--outcome-map', default=None, metavar='INSTRUCTIONS', dest='outcome_map',
+            help='After running the file, print the outcome of INSTRUCTIONS from every start cell and heading.')
+        argParser.add_argument(
+            '--scent-ttl-robots', default=None, type=MainExec.non_negative_int, metavar='N',
+            help='Scents expire once N further robots have run.')
+        argParser.add_argument(
+            '--scent-ttl-ticks', default=None, type=MainExec.non_negative_int, metavar='N',
+            help='Scents expire once N further instructions have run.')
+        argParser.add_argument(
+            '--profile', default=None, metavar='DIR', dest='profile_dir',
+            help='Profile the parse, simulate and output phases, writing <phase>.pstats and <phase>.collapsed files to DIR.')
+        argParser.add_argument(
+            '--profile-mode', default=MainExec.PROFILE_MODES[0], choices=MainExec.PROFILE_MODES,
+            help='cprofile: deterministic, writes .pstats and .collapsed; sample: low overhead stack sampling, writes .collapsed.')
+        argParser.add_argument(
+            '--profile-interval', default=MainExec.DEFAULT_PROFILE_INTERVAL, type=MainExec.positive_float, metavar='SECONDS',
+            help='Sampling interval for --profile-mode sample.')
         parsed = argParser.parse_args()
-        parsedArgs = MainExec.ParsedArgs(parsed.input_file)
+        parsedArgs = MainExec.ParsedArgs(
+            parsed.input_file, parsed.outcome_map, parsed.profile_dir, parsed.profile_mode, parsed.profile_interval,
+            parsed.scent_ttl_robots, parsed.scent_ttl_ticks)
         return parsedArgs
 
-    def do_instructions(self, grid, robot, robot_instructions):
-        for inst in robot_instructions.instruction_list:
-            inst.do(grid, robot)
-            if robot.is_lost:
-                break
+    def parse_args(self):
+        # Fast start: a lone input file, the common case, needs no argparse.
+        args = sys.argv[1:]
+        if len(args) == 1 and not args[0].startswith('-'):
+            return MainExec.ParsedArgs(args[0])
+        return self.buildArgParser()
 
-    def run_main(self):
-        parsedargs = self.buildArgParser()
+    def make_profiler(self, parsedargs):
+        if parsedargs.profile_dir is None:
+            return MainExec.NoProfiler()
+        # Only loaded when asked for, to keep cProfile and threading out of normal runs.
+        from src.profiling import PhaseProfiler
+        return PhaseProfiler(parsedargs.profile_dir, parsedargs.profile_mode, parsedargs.profile_interval)
+
+    def print_outcome_map(self, grid, instructions, profiler):
+        from src.outcomemap import outcome_map
+        print(f'===== {instructions} =====')
+        try:
+            with profiler.phase('simulate'):
+                outcomes = outcome_map(grid, instructions)
+        except ValueError as ex:
+            print(ex)
+            print()
+            exit(ExceptionFileParseCritical.CODE_ROBOT_INSTRUCTIONS_NOT_RECOGNISED)
+        with profiler.phase('output'):
+            for ((start_x, start_y, start_heading), (coord_x, coord_y, heading, is_lost)) in outcomes:
+                print(f'{start_x} {start_y} {start_heading} -> {coord_x} {coord_y} {heading}{" LOST" if is_lost else ""}')
+            print()
+
+    def run_instructions_file(self, parsedargs, profiler):
         input_file = parsedargs.input_file
         print(f'===== {input_file} =====')
         inst_file_processor = InstructionsFile(input_file)
         try:
-            inst_file_processor.initialise_instructions()
-            grid = Grid(inst_file_processor.grid_extents)
-            for robot_instructions in inst_file_processor.next_instructions():
-                robot = Robot()
-                self.do_instructions(grid, robot, robot_instructions)
-                print(str(robot))
+            with profiler.phase('parse'):
+                inst_file_processor.initialise_instructions()
+                grid = Grid(inst_file_processor.grid_extents, parsedargs.scent_ttl_robots, parsedargs.scent_ttl_ticks)
+            # Instruction lines are streamed in chunks, so memory does not grow with line length.
+            # Reading them is therefore part of the simulate phase.
+            results = simulate(grid, inst_file_processor.next_missions_chunked())
+            while True:
+                with profiler.phase('simulate'):
+                    result = next(results, None)
+                if result is None:
+                    break
+                (coord_x, coord_y, heading, is_lost) = result
+                with profiler.phase('output'):
+                    print(f'{coord_x} {coord_y} {heading}{" LOST" if is_lost else ""}')
             print()
+            if parsedargs.outcome_map_instructions is not None:
+                self.print_outcome_map(grid, parsedargs.outcome_map_instructions, profiler)
         except ExceptionFileParseCritical as ex:
             print(ex)
             print(ex.path)
@@ -49,3 +147,11 @@ class MainExec(object):
                 print(f'@{ex.line_num}: "{ex.line}"')
             print()
             exit(ex.code)
+
+    def run_main(self):
+        parsedargs = self.parse_args()
+        profiler = self.make_profiler(parsedargs)
+        try:
+            self.run_instructions_file(parsedargs, profiler)
+        finally:
+            profiler.write()
@@ -0,0 +1,189 @@
+from array import array
+
+from src.location import (
+    Pos,
+    Orientation
+)
+from src.grid import Grid
+from src.simulate import (
+    FORWARD_STEPS,
+    _facing_int_or_raise,
+    _validate_instructions_or_raise
+)
+
+
+class OutcomeMap(object):
+
+    def __init__(self, grid_extents: Pos):
+        self.grid_extents = grid_extents
+        size = (grid_extents.coord_x + 1) * (grid_extents.coord_y + 1) * 4
+        self.final_x = array('q', bytes(8 * size))
+        self.final_y = array('q', bytes(8 * size))
+        self.final_heading = array('b', bytes(size))
+        self.is_lost = array('b', bytes(size))
+
+    def index_of(self, coord_x, coord_y, facing):
+        return (coord_y * (self.grid_extents.coord_x + 1) + coord_x) * 4 + facing
+
+    def set_outcome(self, index, coord_x, coord_y, facing, is_lost):
+        self.final_x[index] = coord_x
+        self.final_y[index] = coord_y
+        self.final_heading[index] = facing
+        self.is_lost[index] = is_lost
+
+    def outcome(self, coord_x, coord_y, heading):
+        facing = _facing_int_or_raise(heading)
+        if not (0 <= coord_x <= self.grid_extents.coord_x and 0 <= coord_y <= self.grid_extents.coord_y):
+            # index_of() would otherwise quietly give another start cell's outcome.
+            raise IndexError(f'Start cell ({coord_x}, {coord_y}) is not on the grid.')
+        index = self.index_of(coord_x, coord_y, facing)
+        return (
+            self.final_x[index], self.final_y[index],
+            Orientation.FacingMap_NumKeys[self.final_heading[index]], bool(self.is_lost[index])
+        )
+
+    def __iter__(self):
+        for coord_y in range(self.grid_extents.coord_y + 1):
+            for coord_x in range(self.grid_extents.coord_x + 1):
+                for facing in range(4):
+                    yield ((coord_x, coord_y, Orientation.FacingMap_NumKeys[facing]),
+                           self.outcome(coord_x, coord_y, facing))
+
+
+class _StartGroup(object):
+    # All start cells sharing a start heading turn together, and, until a scent holds one of them back,
+    # also move together. The survivors are then a rectangle of start cells plus a common offset.
+
+    def __init__(self, facing, grid_extents: Pos):
+        self.facing = facing
+        self.lo_x = 0
+        self.hi_x = grid_extents.coord_x
+        self.lo_y = 0
+        self.hi_y = grid_extents.coord_y
+        self.offset_x = 0
+        self.offset_y = 0
+        # Held back by a scent, so stepped individually: [start_x, start_y, x, y].
+        self.stragglers = []
+        # Start cells inside the rectangle which have become stragglers.
+        self.holes = set()
+
+    def is_empty(self):
+        return self.lo_x > self.hi_x or self.lo_y > self.hi_y
+
+
+def _is_held_by_scent(grid: Grid, coord_x, coord_y, facing, tick):
+    label = grid.get_scent(Pos(coord_x, coord_y))
+    return (
+        label and label.is_next_drop(Orientation(Orientation.FacingMap_NumKeys[facing])) and
+        not label.is_expired_at(tick)
+    )
+
+
+def _scent_cells_by_facing(grid: Grid):
+    # Cells of all scents that can hold a robot back, by the heading they hold back.
+    scent_cells = ([], [], [], [])
+    for (key, label) in grid.labels.items():
+        if label.is_scent_at_edge:
+            (coord_x, coord_y) = key.split(',')
+            scent_cells[label.orientation.get_orientation_int()].append((int(coord_x), int(coord_y), label))
+    return scent_cells
+
+
+def _move_group_forward(grid: Grid, outcomes: OutcomeMap, group: _StartGroup, facing, tick, scent_cells):
+    # tick: the grid's tick as the move starts, for scent expiry.
+    # scent_cells: from _scent_cells_by_facing() if the grid has scents away from its outward edges, else None.
+    max_x = grid.grid_extents.coord_x
+    max_y = grid.grid_extents.coord_y
+    step_x, step_y = FORWARD_STEPS[facing]
+
+    still_held = []
+    for straggler in group.stragglers:
+        (start_x, start_y, coord_x, coord_y) = straggler
+        next_x = coord_x + step_x
+        next_y = coord_y + step_y
+        if scent_cells is not None and _is_held_by_scent(grid, coord_x, coord_y, facing, tick):
+            pass
+        elif 0 <= next_x <= max_x and 0 <= next_y <= max_y:
+            straggler[2] = next_x
+            straggler[3] = next_y
+        elif not _is_held_by_scent(grid, coord_x, coord_y, facing, tick):
+            outcomes.set_outcome(outcomes.index_of(start_x, start_y, group.facing), coord_x, coord_y, facing, True)
+            continue
+        still_held.append(straggler)
+    group.stragglers = still_held
+
+    if group.is_empty():
+        return
+    if scent_cells is not None:
+        # As MoveForward, a scent for the current heading holds a robot back wherever it is, not only at the edge.
+        for (coord_x, coord_y, label) in scent_cells[facing]:
+            if label.is_expired_at(tick):
+                continue
+            start_x = coord_x - group.offset_x
+            start_y = coord_y - group.offset_y
+            if (group.lo_x <= start_x <= group.hi_x and group.lo_y <= start_y <= group.hi_y and
+                    (start_x, start_y) not in group.holes):
+                group.holes.add((start_x, start_y))
+                group.stragglers.append([start_x, start_y, coord_x, coord_y])
+    # The rectangle always lies inside the grid, so at most its leading row or column steps off.
+    edge_cells = ()
+    if step_x > 0 and group.hi_x + group.offset_x == max_x:
+        edge_cells = [(group.hi_x, start_y) for start_y in range(group.lo_y, group.hi_y + 1)]
+        group.hi_x -= 1
+    elif step_x < 0 and group.lo_x + group.offset_x == 0:
+        edge_cells = [(group.lo_x, start_y) for start_y in range(group.lo_y, group.hi_y + 1)]
+        group.lo_x += 1
+    elif step_y > 0 and group.hi_y + group.offset_y == max_y:
+        edge_cells = [(start_x, group.hi_y) for start_x in range(group.lo_x, group.hi_x + 1)]
+        group.hi_y -= 1
+    elif step_y < 0 and group.lo_y + group.offset_y == 0:
+        edge_cells = [(start_x, group.lo_y) for start_x in range(group.lo_x, group.hi_x + 1)]
+        group.lo_y += 1
+    for (start_x, start_y) in edge_cells:
+        if (start_x, start_y) in group.holes:
+            continue
+        coord_x = start_x + group.offset_x
+        coord_y = start_y + group.offset_y
+        if _is_held_by_scent(grid, coord_x, coord_y, facing, tick):
+            group.holes.add((start_x, start_y))
+            group.stragglers.append([start_x, start_y, coord_x, coord_y])
+        else:
+            outcomes.set_outcome(outcomes.index_of(start_x, start_y, group.facing), coord_x, coord_y, facing, True)
+    group.offset_x += step_x
+    group.offset_y += step_y
+
+
+def outcome_map(grid: Grid, instructions):
+    # Outcome of one instruction string from every (x, y, heading) start state, against the grid's current scents.
+    # Each start state is independent: robots lost here do not leave scents on the grid.
+    _validate_instructions_or_raise(instructions)
+    outcomes = OutcomeMap(grid.grid_extents)
+    groups = [_StartGroup(facing, grid.grid_extents) for facing in range(4)]
+    scent_cells = _scent_cells_by_facing(grid) if grid.has_inner_scents else None
+    turns = 0
+    # Every start state is at the same tick; each is run as if it were the grid's next robot.
+    for (ticks_before, a_char) in enumerate(instructions):
+        if a_char == 'R':
+            turns += 1
+        elif a_char == 'L':
+            turns -= 1
+        else:
+            groups = [group for group in groups if group.stragglers or not group.is_empty()]
+            if not groups:
+                break
+            for group in groups:
+                _move_group_forward(
+                    grid, outcomes, group, (group.facing + turns) % 4, grid.tick_count + ticks_before, scent_cells)
+
+    for group in groups:
+        facing = (group.facing + turns) % 4
+        for start_y in range(group.lo_y, group.hi_y + 1):
+            for start_x in range(group.lo_x, group.hi_x + 1):
+                if (start_x, start_y) in group.holes:
+                    continue
+                outcomes.set_outcome(
+                    outcomes.index_of(start_x, start_y, group.facing),
+                    start_x + group.offset_x, start_y + group.offset_y, facing, False)
+        for (start_x, start_y, coord_x, coord_y) in group.stragglers:
+            outcomes.set_outcome(outcomes.index_of(start_x, start_y, group.facing), coord_x, coord_y, facing, False)
+    return outcomes
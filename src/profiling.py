@@ -0,0 +1,176 @@
+import os
+import sys
+import cProfile
+import pstats
+import threading
+from collections import Counter
+
+
+MODE_CPROFILE = 'cprofile'
+MODE_SAMPLE = 'sample'
+PROFILE_MODES = (MODE_CPROFILE, MODE_SAMPLE)
+
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Collapsed-stack conversion of cProfile output: stacks are rebuilt from caller/callee edges,
+# so deep or tiny branches are cut off to keep the output (and the time to write it) bounded.
+COLLAPSED_MAX_DEPTH = 64
+COLLAPSED_MIN_MICROSECONDS = 1
+
+
+def _frame_label(filename, line_num, func_name):
+    return f'{func_name} ({os.path.basename(filename)}:{line_num})'
+
+
+def _pstats_to_collapsed(stats: pstats.Stats):
+    entries = stats.stats
+    callees = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    collapsed = Counter()
+
+    def walk(func, path, funcs_on_path, weight):
+        (_, _, tottime, _, _) = entries[func]
+        self_us = int(round(tottime * weight * 1e6))
+        if self_us >= COLLAPSED_MIN_MICROSECONDS:
+            collapsed[';'.join(path)] += self_us
+        if len(path) >= COLLAPSED_MAX_DEPTH:
+            return
+        for (callee, edge_cumtime) in callees.get(func, ()):
+            callee_cumtime = entries[callee][3]
+            if callee in funcs_on_path or not callee_cumtime:
+                continue
+            callee_weight = weight * edge_cumtime / callee_cumtime
+            if callee_cumtime * callee_weight * 1e6 < COLLAPSED_MIN_MICROSECONDS:
+                continue
+            walk(callee, path + [_frame_label(*callee)], funcs_on_path | {callee}, callee_weight)
+
+    for func, (_, _, _, _, callers) in entries.items():
+        # The profiler's own __exit__ runs while profiling is on, but is not the profiled code.
+        if not callers and func[0] != __file__:
+            walk(func, [_frame_label(*func)], {func}, 1.0)
+    return collapsed
+
+
+def _write_collapsed(path, collapsed):
+    with open(path, 'w') as fl:
+        for (stack, count) in sorted(collapsed.items()):
+            fl.write(f'{stack} {count}\n')
+
+
+class PhaseProfiler(object):
+
+    def __init__(self, output_dir, mode=MODE_CPROFILE, sample_interval=DEFAULT_SAMPLE_INTERVAL):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f'Profile mode "{mode}" not recognised.')
+        # The sampler waits this long between samples; 0 or less would spin it, holding the GIL.
+        if not sample_interval > 0:
+            raise ValueError(f'Sample interval must be more than 0, not {sample_interval}.')
+        self.output_dir = output_dir
+        self.mode = mode
+        self.sample_interval = sample_interval
+        self.__profiles = {}
+        self.__samples = {}
+        self.__phase_stack = []
+        self.__sampled_thread_id = None
+        self.__sampler = None
+        self.__sampler_stop = threading.Event()
+
+    def __sample_loop(self):
+        while not self.__sampler_stop.wait(self.sample_interval):
+            try:
+                phase_name = self.__phase_stack[-1]
+            except IndexError:
+                continue
+            frame = sys._current_frames().get(self.__sampled_thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(_frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            stack.append(phase_name)
+            stack.reverse()
+            self.__samples[phase_name][';'.join(stack)] += 1
+
+    # enable() is the last call on entering a phase, and disable() the first on leaving it, so the profiler's
+    # own calls stay out of the profiles.
+    def _enter_phase(self, name):
+        outer_name = self.__phase_stack[-1] if self.__phase_stack else None
+        self.__phase_stack.append(name)
+        if self.mode == MODE_SAMPLE:
+            self.__samples.setdefault(name, Counter())
+            if self.__sampler is None:
+                self.__sampled_thread_id = threading.get_ident()
+                self.__sampler = threading.Thread(target=self.__sample_loop, daemon=True)
+                self.__sampler.start()
+        else:
+            # Only one cProfile profiler can be active at a time, so an outer phase is paused while an inner one runs.
+            if outer_name is not None:
+                self.__profiles[outer_name].disable()
+            profile = self.__profiles.get(name)
+            if profile is None:
+                profile = self.__profiles[name] = cProfile.Profile()
+            profile.enable()
+
+    def _exit_phase(self):
+        if self.mode == MODE_CPROFILE:
+            self.__profiles[self.__phase_stack[-1]].disable()
+        self.__phase_stack.pop()
+        if self.mode == MODE_CPROFILE and self.__phase_stack:
+            self.__profiles[self.__phase_stack[-1]].enable()
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def write(self):
+        # Writes <phase>.pstats (cProfile mode) and <phase>.collapsed per phase; returns the paths written.
+        if self.__sampler is not None:
+            self.__sampler_stop.set()
+            self.__sampler.join()
+            self.__sampler = None
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = []
+        for (name, profile) in self.__profiles.items():
+            pstats_path = os.path.join(self.output_dir, f'{name}.pstats')
+            profile.dump_stats(pstats_path)
+            collapsed_path = os.path.join(self.output_dir, f'{name}.collapsed')
+            _write_collapsed(collapsed_path, _pstats_to_collapsed(pstats.Stats(profile)))
+            paths += [pstats_path, collapsed_path]
+        for (name, samples) in self.__samples.items():
+            collapsed_path = os.path.join(self.output_dir, f'{name}.collapsed')
+            _write_collapsed(collapsed_path, samples)
+            paths.append(collapsed_path)
+        return paths
+
+
+class _Phase(object):
+    # Profiling is switched on and off directly in __enter__/__exit__, rather than in a generator based
+    # context manager, so the profiled code's frames are the roots of its stacks.
+
+    def __init__(self, profiler: PhaseProfiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._enter_phase(self.name)
+        return self.profiler
+
+    def __exit__(self, *_):
+        self.profiler._exit_phase()
+        return False
+
+
+class _ProfiledRun(_Phase):
+
+    def __exit__(self, *_):
+        self.profiler._exit_phase()
+        self.profiler.write()
+        return False
+
+
+def profiled(output_dir, phase_name='run', mode=MODE_CPROFILE, sample_interval=DEFAULT_SAMPLE_INTERVAL):
+    # Profiles the body as one phase, writing the results at its end; further phases can be nested with
+    # the returned profiler's phase().
+    return _ProfiledRun(PhaseProfiler(output_dir, mode, sample_interval), phase_name)
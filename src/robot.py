@@ -10,6 +10,8 @@ class Robot(object):
         self.__position: Pos = None
         self.__orientation: Orientation = None
         self.__is_lost = False
+        # Instructions run so far, Start aside; with the grid's tick count, the tick for scent expiry.
+        self.__ticks = 0
 
     def set_position(self, new_position: Pos):
         self.__position = new_position
@@ -24,10 +26,17 @@ class Robot(object):
     def is_now_lost(self):
         self.__is_lost = True
 
+    def add_tick(self):
+        self.__ticks += 1
+
     @property
     def is_lost(self):
         return self.__is_lost
 
+    @property
+    def ticks(self):
+        return self.__ticks
+
     @property
     def position(self):
         return self.__position
@@ -0,0 +1,105 @@
+from src.location import (
+    Pos,
+    Orientation,
+    Label
+)
+from src.grid import Grid
+from src.instructionfile import (
+    Instructions,
+    ValidatedInstructionChunks,
+    ERROR_MSG_ROBOT_POSITION_AND_DIRECTION_NOT_RECOGNISED,
+    ERROR_MSG_ROBOT_INSTRUCTIONS_NOT_RECOGNISED
+)
+
+
+# Forward (dx, dy) step, indexed by Orientation.FACING_*[1].
+FORWARD_STEPS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+
+def _facing_int_or_raise(heading):
+    facing = Orientation.FacingMap_CharKeys.get(heading, heading)
+    if facing not in Orientation.FacingMap_NumKeys:
+        raise ValueError(f'{ERROR_MSG_ROBOT_POSITION_AND_DIRECTION_NOT_RECOGNISED} Heading "{heading}"')
+    return facing
+
+
+def _validate_instructions_or_raise(instructions, chunk_offset=0):
+    unrecognised = Instructions.find_unrecognised_instruction(instructions)
+    if unrecognised:
+        (idx, a_char) = unrecognised
+        raise ValueError(f'{ERROR_MSG_ROBOT_INSTRUCTIONS_NOT_RECOGNISED} Character "{a_char}" at position {chunk_offset + idx}')
+
+
+def _run_mission(grid: Grid, coord_x, coord_y, facing, instructions):
+    # Returns (x, y, facing, is_lost, ticks), ticks being the number of instructions executed.
+    max_x = grid.grid_extents.coord_x
+    max_y = grid.grid_extents.coord_y
+    if not (0 <= coord_x <= max_x and 0 <= coord_y <= max_y):
+        return (coord_x, coord_y, facing, True, 0)
+    if isinstance(instructions, str):
+        instructions = (instructions,)
+    needs_validation = not isinstance(instructions, ValidatedInstructionChunks)
+    step_x, step_y = FORWARD_STEPS[facing]
+    # As MoveForward: a scent for the current heading, where the robot stands, means the move is skipped.
+    # Scents are checked against tick expiry at the tick of the move: the grid's ticks, plus this robot's so far.
+    check_scent_every_move = grid.has_inner_scents
+    chunk_offset = 0
+    # Chunks are pulled one at a time, and no more of them once the robot is lost.
+    for chunk in instructions:
+        if needs_validation:
+            _validate_instructions_or_raise(chunk, chunk_offset)
+        chunk_tick = grid.tick_count + chunk_offset
+        for (idx, a_char) in enumerate(chunk):
+            if a_char == 'F':
+                if check_scent_every_move:
+                    label = grid.get_scent(Pos(coord_x, coord_y))
+                    if (label and label.is_next_drop(Orientation(Orientation.FacingMap_NumKeys[facing])) and
+                            not label.is_expired_at(chunk_tick + idx)):
+                        label.hits += 1
+                        continue
+                next_x = coord_x + step_x
+                next_y = coord_y + step_y
+                if 0 <= next_x <= max_x and 0 <= next_y <= max_y:
+                    coord_x = next_x
+                    coord_y = next_y
+                    continue
+                current_pos = Pos(coord_x, coord_y)
+                orientation = Orientation(Orientation.FacingMap_NumKeys[facing])
+                if not check_scent_every_move:
+                    # Otherwise, scents can only be at outward edges, so only need checking here.
+                    label = grid.get_scent(current_pos)
+                    if label and label.is_next_drop(orientation) and not label.is_expired_at(chunk_tick + idx):
+                        label.hits += 1
+                        continue
+                grid.add_scent(current_pos, Label(orientation))
+                # The move that loses the robot is its last tick.
+                return (coord_x, coord_y, facing, True, chunk_offset + idx + 1)
+            elif a_char == 'R':
+                facing = (facing + 1) % 4
+            else:
+                facing = (facing - 1) % 4
+            step_x, step_y = FORWARD_STEPS[facing]
+        chunk_offset += len(chunk)
+    return (coord_x, coord_y, facing, False, chunk_offset)
+
+
+def simulate(grid: Grid, missions):
+    # missions: iterable of (x, y, heading, instructions), heading as 'N'/'E'/'S'/'W' or Orientation int,
+    # instructions as a string or an iterable of string chunks (e.g. InstructionsFile.next_missions_chunked()).
+    # Yields final (x, y, heading, is_lost) per mission; scents are left on (and shared through) the given grid.
+    for (coord_x, coord_y, heading, instructions) in missions:
+        (coord_x, coord_y, facing, is_lost, ticks) = _run_mission(grid, coord_x, coord_y, _facing_int_or_raise(heading), instructions)
+        grid.advance(ticks=ticks)
+        yield (coord_x, coord_y, Orientation.FacingMap_NumKeys[facing], is_lost)
+
+
+def simulate_array(grid: Grid, missions):
+    # As simulate(), but returns a flat array of (x, y, orientation int, is_lost) quadruples.
+    # array is imported here as it pulls in collections, which the command line start up does not need.
+    from array import array
+    results = array('q')
+    for (coord_x, coord_y, heading, instructions) in missions:
+        (coord_x, coord_y, facing, is_lost, ticks) = _run_mission(grid, coord_x, coord_y, _facing_int_or_raise(heading), instructions)
+        grid.advance(ticks=ticks)
+        results.extend((coord_x, coord_y, facing, is_lost))
+    return results
@@ -3,6 +3,7 @@ import unittest
 import os
 import glob
 import shutil
+import tracemalloc
 
 from tests.test_0_instructionfile_gridextents import TestInstructionFileBase
 
@@ -13,6 +14,7 @@ from src.instructionfile import (
 from src.location import Pos
 from src.grid import Grid
 from src.robot import Robot
+from src.simulate import simulate
 
 
 class TestInstructionFile_Instructions(TestInstructionFileBase):
@@ -248,3 +250,88 @@ class TestInstructionFile_Instructions(TestInstructionFileBase):
             self.assertEqual(str(robot), expectations[count][1])
             count += 1
         self.assertEqual(count, 3)
+
+    def test_read_missions_chunked(self):
+        dir_name = self._create_dir()
+        filepath = f'{dir_name}/allgood'
+        with open(filepath, 'a') as fl:
+            fl.write('''5 3\n\n1 1 E\nRFRFRFRF\n\n3 2 N\nFRRFLLFFRRFLL\n\n0 3 W\nLLFFFLFLFL\n''')
+        inst_file_processor = InstructionsFile(filepath)
+        inst_file_processor.initialise_instructions()
+        missions = [
+            (coord_x, coord_y, heading, list(chunks))
+            for (coord_x, coord_y, heading, chunks) in inst_file_processor.next_missions_chunked(chunk_size=4)
+        ]
+        self.assertEqual(missions, [
+            (1, 1, 'E', ['RFRF', 'RFRF']),
+            (3, 2, 'N', ['FRRF', 'LLFF', 'RRFL', 'L']),
+            (0, 3, 'W', ['LLFF', 'FLFL', 'FL']),
+        ])
+
+    def test_read_missions_chunked_bad_instruction(self):
+        dir_name = self._create_dir()
+        filepath = f'{dir_name}/badinst'
+        with open(filepath, 'a') as fl:
+            fl.write('''5 3\n1 1 E\nRFRFRFXF\n''')
+        inst_file_processor = InstructionsFile(filepath)
+        inst_file_processor.initialise_instructions()
+        with self.assertRaises(ExceptionFileParseCritical) as exception_context:
+            for (_, _, _, chunks) in inst_file_processor.next_missions_chunked(chunk_size=3):
+                list(chunks)
+        self.assertEqual(exception_context.exception.code, ExceptionFileParseCritical.CODE_ROBOT_INSTRUCTIONS_NOT_RECOGNISED)
+        self.assertEqual(exception_context.exception.line_num, 3)
+        self.assertEqual(exception_context.exception.line, 'Character "X" at position 6')
+
+    def test_read_missions_chunked_bad_instruction_robot_lost_at_start(self):
+        dir_name = self._create_dir()
+        filepath = f'{dir_name}/badinstoffgrid'
+        with open(filepath, 'a') as fl:
+            fl.write('''5 3\n10 10 S\n 2 2 W \n''')
+        inst_file_processor = InstructionsFile(filepath)
+        inst_file_processor.initialise_instructions()
+        with self.assertRaises(ExceptionFileParseCritical) as exception_context:
+            list(simulate(Grid(inst_file_processor.grid_extents), inst_file_processor.next_missions_chunked()))
+        self.assertEqual(exception_context.exception.code, ExceptionFileParseCritical.CODE_ROBOT_INSTRUCTIONS_NOT_RECOGNISED)
+        self.assertEqual(exception_context.exception.line_num, 3)
+
+    def test_read_missions_chunked_rest_of_line_skipped(self):
+        dir_name = self._create_dir()
+        filepath = f'{dir_name}/lost'
+        with open(filepath, 'a') as fl:
+            fl.write('''5 3\n3 2 N\nFF''' + 'X' * 100 + '''\n\n0 3 W\nLLFFFLFLFL\n''')
+        inst_file_processor = InstructionsFile(filepath)
+        inst_file_processor.initialise_instructions()
+        grid = Grid(inst_file_processor.grid_extents)
+        results = list(simulate(grid, inst_file_processor.next_missions_chunked(chunk_size=2)))
+        self.assertEqual(results, [(3, 3, 'N', True), (2, 3, 'S', False)])
+        self.assertEqual(inst_file_processor.file_line_num, 6)
+
+    def test_read_missions_chunked_missing_instructions(self):
+        dir_name = self._create_dir()
+        filepath = f'{dir_name}/noinst'
+        with open(filepath, 'a') as fl:
+            fl.write('''5 3\n1 1 E\nRF\n3 2 N\n''')
+        inst_file_processor = InstructionsFile(filepath)
+        inst_file_processor.initialise_instructions()
+        with self.assertRaises(ExceptionFileParseCritical) as exception_context:
+            list(simulate(Grid(inst_file_processor.grid_extents), inst_file_processor.next_missions_chunked()))
+        self.assertEqual(exception_context.exception.code, ExceptionFileParseCritical.CODE_ROBOT_INSTRUCTIONS_MISSING)
+        self.assertEqual(exception_context.exception.line_num, 4)
+
+    def test_read_missions_chunked_long_line_bounded_memory(self):
+        dir_name = self._create_dir()
+        filepath = f'{dir_name}/longline'
+        with open(filepath, 'a') as fl:
+            fl.write('''5 3\n1 1 E\n''')
+            for _ in range(16):
+                fl.write('FRRFRR' * 16 * 1024)
+            fl.write('''\n''')
+        inst_file_processor = InstructionsFile(filepath)
+        inst_file_processor.initialise_instructions()
+        grid = Grid(inst_file_processor.grid_extents)
+        tracemalloc.start()
+        results = list(simulate(grid, inst_file_processor.next_missions_chunked(chunk_size=4096)))
+        (_, peak) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertEqual(results, [(1, 1, 'E', False)])
+        self.assertLess(peak, 256 * 1024)  # The line itself is 1.5MB.
@@ -0,0 +1,137 @@
+import unittest
+import random
+from unittest import mock
+
+from tests.test_0_instructionfile_gridextents import TestInstructionFileBase
+
+from src.instructionfile import (
+    InstructionsFile,
+    Instructions,
+    Start
+)
+from src.location import (
+    Pos,
+    Orientation,
+    Label
+)
+from src.grid import Grid
+from src.robot import Robot
+from src.simulate import (
+    simulate,
+    simulate_array
+)
+
+
+def run_operations(grid, missions):
+    # Reference results, through the baseline Operation/Robot path.
+    results = []
+    for (coord_x, coord_y, heading, instructions) in missions:
+        robot = Robot()
+        operations = [Start(Pos(coord_x, coord_y), Orientation(heading))]
+        operations += [Instructions.create_instruction(a_char) for a_char in instructions]
+        Instructions(operations).run(grid, robot)
+        results.append((robot.position.coord_x, robot.position.coord_y, str(robot.orientation), robot.is_lost))
+    return results
+
+
+def random_grid_and_missions(rng, grid_class=Grid):
+    grid_extents = Pos(rng.randint(0, 6), rng.randint(0, 6))
+    scents = []
+    for _ in range(rng.randint(0, 6)):
+        scents.append((
+            Pos(rng.randint(0, grid_extents.coord_x), rng.randint(0, grid_extents.coord_y)),
+            rng.choice('NESW'), rng.random() < 0.8))
+    missions = []
+    for _ in range(rng.randint(1, 5)):
+        missions.append((
+            rng.randint(0, grid_extents.coord_x + 1), rng.randint(0, grid_extents.coord_y + 1), rng.choice('NESW'),
+            ''.join(rng.choice('FFFRL') for _ in range(rng.randint(0, 25)))))
+
+    def make_grid():
+        grid = grid_class(grid_extents)
+        for (pos, heading, is_scent_at_edge) in scents:
+            grid.add_scent(pos, Label(Orientation(heading), is_scent_at_edge))
+        return grid
+    return (make_grid, missions)
+
+
+class TestSimulate(TestInstructionFileBase):
+
+    SAMPLE_MISSIONS = (
+        (1, 1, 'E', 'RFRFRFRF'),
+        (3, 2, 'N', 'FRRFLLFFRRFLL'),
+        (0, 3, 'W', 'LLFFFLFLFL'),
+    )
+    SAMPLE_RESULTS = [
+        (1, 1, 'E', False),
+        (3, 3, 'N', True),
+        (2, 3, 'S', False),
+    ]
+
+    def test_simulate_sample_missions(self):
+        grid = Grid(Pos(5, 3))
+        self.assertEqual(list(simulate(grid, TestSimulate.SAMPLE_MISSIONS)), TestSimulate.SAMPLE_RESULTS)
+        self.assertIsNotNone(grid.get_scent(Pos(3, 3)))
+
+    def test_simulate_reuses_grid_scents(self):
+        grid = Grid(Pos(5, 3))
+        self.assertEqual(list(simulate(grid, [(3, 2, 'N', 'FF')])), [(3, 3, 'N', True)])
+        self.assertEqual(list(simulate(grid, [(3, 2, 0, 'FFR')])), [(3, 3, 'E', False)])
+
+    def test_simulate_start_off_grid(self):
+        grid = Grid(Pos(5, 3))
+        self.assertEqual(list(simulate(grid, [(6, 1, 'N', 'FFF')])), [(6, 1, 'N', True)])
+        self.assertEqual(grid.labels, {})
+
+    def test_simulate_inner_scent(self):
+        grid = Grid(Pos(5, 3))
+        grid.add_scent(Pos(1, 1), Label(Orientation('E')))
+        self.assertTrue(grid.has_inner_scents)
+        self.assertEqual(list(simulate(grid, [(1, 2, 'E', 'RFLFF')])), [(1, 1, 'E', False)])
+        self.assertEqual(grid.get_scent(Pos(1, 1)).hits, 2)
+
+    def test_simulate_matches_operations(self):
+        rng = random.Random(26)
+        for _ in range(500):
+            (make_grid, missions) = random_grid_and_missions(rng)
+            (engine_grid, reference_grid) = (make_grid(), make_grid())
+            self.assertEqual(list(simulate(engine_grid, missions)), run_operations(reference_grid, missions), missions)
+            self.assertEqual(sorted(engine_grid.labels), sorted(reference_grid.labels))
+
+    def test_simulate_array(self):
+        grid = Grid(Pos(5, 3))
+        results = simulate_array(grid, TestSimulate.SAMPLE_MISSIONS)
+        self.assertEqual(list(results), [1, 1, 1, 0, 3, 3, 0, 1, 2, 3, 2, 0])
+
+    def test_simulate_bad_input(self):
+        grid = Grid(Pos(5, 3))
+        with self.assertRaises(ValueError) as exception_context:
+            list(simulate(grid, [(1, 1, 'E', 'RFXF')]))
+        self.assertEqual(str(exception_context.exception), 'ERROR - robot instructions not recognised. Character "X" at position 2')
+        with self.assertRaises(ValueError):
+            list(simulate(grid, [(1, 1, 'Q', 'RF')]))
+
+    def test_simulate_from_instructions_file(self):
+        dir_name = self._create_dir()
+        filepath = f'{dir_name}/allgood'
+        with open(filepath, 'a') as fl:
+            fl.write('''5 3\n\n1 1 E\nRFRFRFRF\n\n3 2 N\nFRRFLLFFRRFLL\n\n0 3 W\nLLFFFLFLFL\n''')
+        inst_file_processor = InstructionsFile(filepath)
+        inst_file_processor.initialise_instructions()
+        grid = Grid(inst_file_processor.grid_extents)
+        results = list(simulate(grid, inst_file_processor.next_missions()))
+        self.assertEqual(results, TestSimulate.SAMPLE_RESULTS)
+
+    def test_simulate_chunks_from_file_validated_once(self):
+        dir_name = self._create_dir()
+        filepath = f'{dir_name}/allgood'
+        with open(filepath, 'a') as fl:
+            fl.write('''5 3\n1 1 E\nRFRFRFRF\n3 2 N\nFRRFLLFFRRFLL\n''')
+        inst_file_processor = InstructionsFile(filepath)
+        inst_file_processor.initialise_instructions()
+        grid = Grid(inst_file_processor.grid_extents)
+        with mock.patch('src.simulate._validate_instructions_or_raise') as validate:
+            results = list(simulate(grid, inst_file_processor.next_missions_chunked(chunk_size=4)))
+            list(simulate(grid, [(1, 1, 'E', 'RF')]))
+        self.assertEqual(results, TestSimulate.SAMPLE_RESULTS[:2])
+        self.assertEqual(validate.call_count, 1)
@@ -0,0 +1,76 @@
+import unittest
+import random
+
+from src.location import (
+    Pos,
+    Orientation,
+    Label
+)
+from src.grid import Grid
+from src.outcomemap import outcome_map
+
+from tests.test_2_simulate import (
+    run_operations,
+    random_grid_and_missions
+)
+
+
+class TestOutcomeMap(unittest.TestCase):
+
+    def __copy_grid(self, grid):
+        grid_copy = Grid(grid.grid_extents)
+        for (key, label) in grid.labels.items():
+            (coord_x, coord_y) = key.split(',')
+            grid_copy.add_scent(Pos(int(coord_x), int(coord_y)), Label(label.orientation, label.is_scent_at_edge))
+        return grid_copy
+
+    def __assert_matches_single_simulations(self, grid, instructions):
+        outcomes = outcome_map(grid, instructions)
+        labels_before = dict(grid.labels)
+        for (start_state, outcome) in outcomes:
+            expected = run_operations(self.__copy_grid(grid), [start_state + (instructions,)])[0]
+            self.assertEqual(outcome, expected, f'{start_state} {instructions}')
+        self.assertEqual(grid.labels, labels_before)
+
+    def test_sample_instructions(self):
+        grid = Grid(Pos(5, 3))
+        outcomes = outcome_map(grid, 'FRRFLLFFRRFLL')
+        self.assertEqual(outcomes.outcome(3, 2, 'N'), (3, 3, 'N', True))
+        self.assertEqual(outcomes.outcome(1, 1, 'E'), (2, 1, 'E', False))
+        self.assertEqual(len(outcomes.is_lost), 6 * 4 * 4)
+        self.__assert_matches_single_simulations(grid, 'FRRFLLFFRRFLL')
+
+    def test_scent_holds_robots_back(self):
+        grid = Grid(Pos(5, 3))
+        grid.add_scent(Pos(3, 3), Label(Orientation('N')))
+        outcomes = outcome_map(grid, 'FFFFR')
+        self.assertEqual(outcomes.outcome(3, 0, 'N'), (3, 3, 'E', False))
+        self.assertEqual(outcomes.outcome(2, 0, 'N'), (2, 3, 'N', True))
+        self.__assert_matches_single_simulations(grid, 'FFFFR')
+
+    def test_inner_scent_holds_robots_back(self):
+        grid = Grid(Pos(5, 3))
+        grid.add_scent(Pos(1, 1), Label(Orientation('E')))
+        outcomes = outcome_map(grid, 'RFLFF')
+        self.assertEqual(outcomes.outcome(1, 2, 'E'), (1, 1, 'E', False))
+        self.assertEqual(outcomes.outcome(0, 2, 'E'), (1, 1, 'E', False))
+        self.__assert_matches_single_simulations(grid, 'RFLFF')
+
+    def test_start_state_not_on_grid(self):
+        outcomes = outcome_map(Grid(Pos(5, 3)), 'F')
+        for (coord_x, coord_y) in ((6, 0), (-1, 0), (0, 4), (0, -1)):
+            with self.assertRaises(IndexError):
+                outcomes.outcome(coord_x, coord_y, 'N')
+        for heading in ('X', 4, None):
+            with self.assertRaises(ValueError):
+                outcomes.outcome(0, 0, heading)
+
+    def test_matches_single_simulations(self):
+        rng = random.Random(5)
+        for _ in range(60):
+            (make_grid, missions) = random_grid_and_missions(rng)
+            self.__assert_matches_single_simulations(make_grid(), missions[0][3])
+
+    def test_bad_instructions(self):
+        with self.assertRaises(ValueError):
+            outcome_map(Grid(Pos(5, 3)), 'FFX')
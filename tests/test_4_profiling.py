@@ -0,0 +1,95 @@
+import unittest
+
+import os
+import re
+import pstats
+
+from tests.test_0_instructionfile_gridextents import TestInstructionFileBase
+
+from src.location import Pos
+from src.grid import Grid
+from src.simulate import simulate
+from src.main_robomars import MainExec
+from src.profiling import (
+    PhaseProfiler,
+    profiled,
+    MODE_SAMPLE,
+    PROFILE_MODES,
+    DEFAULT_SAMPLE_INTERVAL
+)
+
+
+def run_engine():
+    return list(simulate(Grid(Pos(5, 3)), TestProfiling.MISSIONS))
+
+
+def write_output(results):
+    return [f'{result}' for result in results]
+
+
+class TestProfiling(TestInstructionFileBase):
+
+    RE_Collapsed_Line = re.compile(r'^[^;\n]+(;[^;\n]+)* \d+$')
+    MISSIONS = [(1, 1, 'E', 'RFRFRFRF' * 5000), (3, 2, 'N', 'FRRFLLFFRRFLL')]
+
+    def __assert_collapsed_file(self, path):
+        with open(path) as fl:
+            lines = fl.read().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            self.assertRegex(line, TestProfiling.RE_Collapsed_Line)
+        return lines
+
+    def test_profiled_cprofile(self):
+        dir_name = self._create_dir('profile')
+        with profiled(dir_name, 'engine') as profiler:
+            list(simulate(Grid(Pos(5, 3)), TestProfiling.MISSIONS))
+            with profiler.phase('nested'):
+                list(simulate(Grid(Pos(5, 3)), TestProfiling.MISSIONS))
+        self.assertEqual(sorted(os.listdir(dir_name)), ['engine.collapsed', 'engine.pstats', 'nested.collapsed', 'nested.pstats'])
+        functions = [func[2] for func in pstats.Stats(f'{dir_name}/engine.pstats').stats]
+        self.assertIn('_run_mission', functions)
+        lines = self.__assert_collapsed_file(f'{dir_name}/engine.collapsed')
+        self.assertTrue(any('_run_mission (simulate.py:' in line for line in lines))
+
+    def test_phase_stacks_rooted_at_caller_code(self):
+        dir_name = self._create_dir('profile')
+        with profiled(dir_name, 'outer') as profiler:
+            # Switching phase per item, as the command line does per robot.
+            for _ in range(20):
+                with profiler.phase('simulate'):
+                    results = run_engine()
+                with profiler.phase('output'):
+                    write_output(results)
+        for (phase_name, root_function) in (('simulate', 'run_engine'), ('output', 'write_output')):
+            functions = pstats.Stats(f'{dir_name}/{phase_name}.pstats').stats
+            (root,) = [func for func in functions if func[2] == root_function]
+            self.assertEqual(functions[root][4], {})
+            lines = self.__assert_collapsed_file(f'{dir_name}/{phase_name}.collapsed')
+            for line in lines:
+                self.assertTrue(line.startswith(f'{root_function} (test_4_profiling.py:'), line)
+                self.assertNotIn('profiling.py:', line.replace('test_4_profiling.py:', ''))
+                self.assertNotIn('contextlib.py:', line)
+
+    def test_phases_sampled(self):
+        dir_name = self._create_dir('profile')
+        profiler = PhaseProfiler(dir_name, MODE_SAMPLE, sample_interval=0.001)
+        with profiler.phase('simulate'):
+            for _ in range(20):
+                list(simulate(Grid(Pos(5, 3)), TestProfiling.MISSIONS))
+        self.assertEqual(profiler.write(), [f'{dir_name}/simulate.collapsed'])
+        lines = self.__assert_collapsed_file(f'{dir_name}/simulate.collapsed')
+        self.assertTrue(all(line.startswith('simulate;') for line in lines))
+
+    def test_bad_mode(self):
+        with self.assertRaises(ValueError):
+            PhaseProfiler('unused', 'flame')
+
+    def test_command_line_profile_options_match(self):
+        self.assertEqual(MainExec.PROFILE_MODES, PROFILE_MODES)
+        self.assertEqual(MainExec.DEFAULT_PROFILE_INTERVAL, DEFAULT_SAMPLE_INTERVAL)
+
+    def test_bad_sample_interval(self):
+        for interval in (0, -0.005, float('nan')):
+            with self.assertRaises(ValueError):
+                PhaseProfiler('unused', MODE_SAMPLE, sample_interval=interval)
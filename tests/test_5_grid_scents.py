@@ -0,0 +1,126 @@
+import unittest
+import random
+
+from src.instructionfile import (
+    MoveForward,
+    Start
+)
+from src.location import (
+    Pos,
+    Orientation,
+    Label
+)
+from src.grid import Grid
+from src.robot import Robot
+from src.simulate import simulate
+from src.outcomemap import outcome_map
+
+from tests.test_2_simulate import (
+    run_operations,
+    random_grid_and_missions
+)
+
+
+class TestGridScents(unittest.TestCase):
+
+    LOSE_AT_3_3 = (3, 2, 'N', 'FF')
+
+    def test_scents_last_forever_by_default(self):
+        grid = Grid(Pos(5, 3))
+        results = list(simulate(grid, [TestGridScents.LOSE_AT_3_3] * 50))
+        self.assertEqual(results, [(3, 3, 'N', True)] + [(3, 3, 'N', False)] * 49)
+        self.assertEqual(grid.get_scent(Pos(3, 3)).hits, 49)
+        self.assertEqual(grid.robot_count, 50)
+        self.assertEqual(grid.tick_count, 2 * 50)
+
+    def test_scent_ttl_robots(self):
+        grid = Grid(Pos(5, 3), scent_ttl_robots=2)
+        results = list(simulate(grid, [TestGridScents.LOSE_AT_3_3] * 7))
+        self.assertEqual([result[3] for result in results], [True, False, False, True, False, False, True])
+
+    def test_scent_ttl_ticks(self):
+        grid = Grid(Pos(5, 3), scent_ttl_ticks=5)
+        missions = [TestGridScents.LOSE_AT_3_3, (0, 0, 'E', 'FFF'), TestGridScents.LOSE_AT_3_3, TestGridScents.LOSE_AT_3_3]
+        results = list(simulate(grid, missions))
+        self.assertEqual([result[3] for result in results], [True, False, False, True])
+        self.assertEqual(grid.tick_count, 2 + 3 + 2 + 2)
+
+    def test_scent_ttl_per_scent(self):
+        grid = Grid(Pos(5, 3))
+        grid.add_scent(Pos(0, 0), Label(Orientation('S')), ttl_robots=1)
+        grid.add_scent(Pos(5, 0), Label(Orientation('S')), ttl_ticks=1)
+        grid.add_scent(Pos(5, 3), Label(Orientation('N')))
+        grid.advance()
+        self.assertEqual(sorted(grid.labels), ['0,0', '5,0', '5,3'])
+        grid.advance(ticks=1)
+        self.assertEqual(sorted(grid.labels), ['5,3'])
+
+    def test_replaced_scent_not_expired_by_old_entry(self):
+        grid = Grid(Pos(5, 3), scent_ttl_robots=1)
+        grid.add_scent(Pos(0, 0), Label(Orientation('S')))
+        grid.advance()
+        replacement = Label(Orientation('W'))
+        grid.add_scent(Pos(0, 0), replacement, ttl_robots=10)
+        grid.advance()
+        self.assertIs(grid.get_scent(Pos(0, 0)), replacement)
+
+    def test_replaced_scents_do_not_grow_expiries(self):
+        grid = Grid(Pos(5, 3), scent_ttl_robots=1000000, scent_ttl_ticks=1000000)
+        grid.add_scent(Pos(0, 0), Label(Orientation('S')))
+        grid.advance()
+        one_scent_bytes = grid.estimated_bytes()
+        self.assertGreater(one_scent_bytes, Grid(Pos(5, 3)).estimated_bytes() + 176)
+        for _ in range(100000):
+            grid.add_scent(Pos(0, 0), Label(Orientation('S')))
+            grid.advance()
+        self.assertEqual(len(grid.labels), 1)
+        self.assertLess(grid.estimated_bytes(), 50 * one_scent_bytes)
+
+    def test_scent_hits_operation_path(self):
+        grid = Grid(Pos(5, 3))
+        grid.add_scent(Pos(3, 3), Label(Orientation('N')))
+        robot = Robot()
+        for inst in (Start(Pos(3, 2), Orientation('N')), MoveForward(), MoveForward(), MoveForward()):
+            inst.do(grid, robot)
+        self.assertEqual(str(robot), '3 3 N')
+        self.assertEqual(grid.get_scent(Pos(3, 3)).hits, 2)
+
+    def test_scent_ttl_ticks_within_robot(self):
+        for (instructions, expected) in (('FRLRLF', (3, 3, 'N', True)), ('FFRLF', (3, 3, 'N', False))):
+            grid = Grid(Pos(5, 3), scent_ttl_ticks=5)
+            list(simulate(grid, [TestGridScents.LOSE_AT_3_3]))
+            # The scent expires at tick 7; the final move starts at tick 2 + 5, or 2 + 4.
+            outcomes = outcome_map(grid, instructions)
+            self.assertEqual(list(simulate(grid, [(3, 2, 'N', instructions)])), [expected])
+            self.assertEqual(outcomes.outcome(3, 2, 'N'), expected)
+
+    def test_scent_ttl_operation_path_matches_simulate(self):
+        grid = Grid(Pos(5, 3), scent_ttl_ticks=1)
+        missions = [TestGridScents.LOSE_AT_3_3, (3, 2, 'N', 'FFF')]
+        self.assertEqual(run_operations(grid, missions), [(3, 3, 'N', True), (3, 3, 'N', True)])
+        rng = random.Random(30)
+        for _ in range(300):
+            ttls = {'scent_ttl_robots': rng.choice((None, 0, 1, 2)), 'scent_ttl_ticks': rng.choice((None, 0, 3, 10))}
+            (make_grid, missions) = random_grid_and_missions(rng, lambda grid_extents: Grid(grid_extents, **ttls))
+            (operations_grid, simulate_grid) = (make_grid(), make_grid())
+            self.assertEqual(run_operations(operations_grid, missions), list(simulate(simulate_grid, missions)), missions)
+            self.assertEqual(operations_grid.tick_count, simulate_grid.tick_count)
+            self.assertEqual(sorted(operations_grid.labels), sorted(simulate_grid.labels))
+
+    def test_inner_scent_ttl_ticks_within_robot(self):
+        grid = Grid(Pos(5, 3))
+        grid.add_scent(Pos(1, 1), Label(Orientation('E')), ttl_ticks=3)
+        grid.advance(robots=0)
+        self.assertEqual(outcome_map(grid, 'FF').outcome(1, 1, 'E'), (1, 1, 'E', False))
+        self.assertEqual(outcome_map(grid, 'RLRLFF').outcome(1, 1, 'E'), (3, 1, 'E', False))
+        self.assertEqual(list(simulate(grid, [(1, 1, 'E', 'RLFRLF')])), [(2, 1, 'E', False)])
+
+    def test_negative_scent_ttl_rejected(self):
+        for ttls in ({'scent_ttl_robots': -1}, {'scent_ttl_ticks': -5}):
+            with self.assertRaises(ValueError):
+                Grid(Pos(5, 3), **ttls)
+        grid = Grid(Pos(5, 3))
+        for ttls in ({'ttl_robots': -1}, {'ttl_ticks': -1}):
+            with self.assertRaises(ValueError):
+                grid.add_scent(Pos(0, 0), Label(Orientation('S')), **ttls)
+        self.assertEqual(grid.labels, {})
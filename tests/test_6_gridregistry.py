@@ -0,0 +1,92 @@
+import unittest
+
+import os
+
+from tests.test_0_instructionfile_gridextents import TestInstructionFileBase
+
+from src.location import (
+    Pos,
+    Orientation,
+    Label
+)
+from src.grid import Grid
+from src.simulate import simulate
+from src.gridregistry import GridRegistry
+
+
+class TestGridSnapshot(unittest.TestCase):
+
+    def test_round_trip(self):
+        grid = Grid(Pos(5, 3), scent_ttl_robots=3)
+        list(simulate(grid, [(3, 2, 'N', 'FF'), (3, 2, 'N', 'FF'), (0, 0, 'W', 'F')]))
+        grid.add_scent(Pos(5, 0), Label(Orientation('E'), False), ttl_ticks=4)
+        restored = Grid.from_bytes(grid.to_bytes())
+        self.assertEqual((restored.grid_extents.coord_x, restored.grid_extents.coord_y), (5, 3))
+        self.assertEqual((restored.scent_ttl_robots, restored.scent_ttl_ticks), (3, None))
+        self.assertEqual((restored.robot_count, restored.tick_count), (3, 5))
+        self.assertEqual(sorted(restored.labels), ['0,0', '3,3', '5,0'])
+        self.assertEqual(restored.get_scent(Pos(3, 3)).hits, 1)
+        self.assertEqual(str(restored.get_scent(Pos(0, 0)).orientation), 'W')
+        self.assertFalse(restored.get_scent(Pos(5, 0)).is_scent_at_edge)
+        for copy in (grid, restored):
+            copy.advance()
+            self.assertEqual(sorted(copy.labels), ['0,0', '5,0'])
+            copy.advance(robots=0, ticks=4)
+            self.assertEqual(sorted(copy.labels), ['0,0'])
+
+    def test_not_a_snapshot(self):
+        with self.assertRaises(ValueError):
+            Grid.from_bytes(b'XXXX' + bytes(100))
+
+
+class TestGridRegistry(TestInstructionFileBase):
+
+    def test_lru_eviction_and_reload(self):
+        dir_name = self._create_dir('registry')
+        budget = 3 * Grid(Pos(5, 3)).estimated_bytes()
+        registry = GridRegistry(dir_name, budget)
+        for grid_id in range(4):
+            registry.put(f'sector/{grid_id}', Grid(Pos(5, 3)))
+        self.assertEqual(registry.evictions, 1)
+        self.assertEqual(registry.resident_grids, 3)
+        self.assertEqual(os.listdir(dir_name), ['sector%2F0.grid'])
+
+        registry.get('sector/1')
+        list(simulate(registry.get('sector/1'), [(3, 2, 'N', 'FF')]))
+        self.assertEqual((registry.hits, registry.misses), (2, 0))
+
+        # Reloading sector/0 evicts the least recently used grid, sector/2.
+        self.assertIn('sector/0', registry)
+        self.assertEqual(registry.get('sector/0').labels, {})
+        self.assertEqual((registry.hits, registry.misses), (2, 1))
+        self.assertIn('sector%2F2.grid', os.listdir(dir_name))
+        self.assertLessEqual(registry.resident_bytes, budget)
+
+        # The scent added to sector/1 through simulate() survives its eviction.
+        for grid_id in (2, 3, 0):
+            registry.get(f'sector/{grid_id}')
+        self.assertEqual(sorted(registry.get('sector/1').labels), ['3,3'])
+        self.assertAlmostEqual(registry.hit_rate, registry.hits / (registry.hits + registry.misses))
+
+    def test_resident_bytes_follow_scents_added(self):
+        registry = GridRegistry(self._create_dir('registry'), 10 ** 9)
+        registry.put('a', Grid(Pos(200, 200)))
+        grid = registry.get('a')
+        for coord_x in range(100):
+            grid.add_scent(Pos(coord_x, 0), Label(Orientation('S')))
+        self.assertEqual(registry.resident_bytes, grid.estimated_bytes())
+
+    def test_unknown_grid(self):
+        registry = GridRegistry(self._create_dir('registry'), 10000)
+        self.assertNotIn('nowhere', registry)
+        with self.assertRaises(KeyError):
+            registry.get('nowhere')
+
+    def test_flush(self):
+        dir_name = self._create_dir('registry')
+        registry = GridRegistry(dir_name, 10000)
+        grid = Grid(Pos(5, 3))
+        grid.add_scent(Pos(1, 3), Label(Orientation('N')))
+        registry.put('a', grid)
+        registry.flush()
+        self.assertEqual(sorted(GridRegistry(dir_name, 10000).get('a').labels), ['1,3'])
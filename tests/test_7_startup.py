@@ -0,0 +1,73 @@
+import unittest
+
+import os
+import sys
+import time
+import statistics
+import subprocess
+
+from tests.test_0_instructionfile_gridextents import TestInstructionFileBase
+
+from tools.build_zipapp import build_zipapp
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Start up budget: wall time of a one robot run, over that of a bare interpreter, as the median of a few runs.
+# Before lazy imports this was ~40ms; fails if start up cost creeps back.
+STARTUP_OVERHEAD_BUDGET_MS = 30
+STARTUP_RUNS = 7
+
+# Not needed to run a small instructions file, so must not be imported to do so.
+SLOW_START_MODULES = {
+    'argparse', 're', 'enum', 'contextlib', 'collections', 'threading', 'array',
+    'cProfile', 'pstats', 'heapq', 'struct', 'itertools', 'operator',
+    'src.outcomemap', 'src.profiling', 'src.gridregistry'
+}
+
+
+class TestStartup(TestInstructionFileBase):
+
+    SAMPLE_SINGLE = os.path.join(PROJECT_DIR, 'tests', 'testfiles', 'sample_input_single')
+
+    def __run(self, *args):
+        return subprocess.run(
+            [sys.executable, *args], cwd=PROJECT_DIR, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True, check=False)
+
+    def __imported_modules(self, *args):
+        result = self.__run('-X', 'importtime', *args)
+        return {line.rsplit('|', 1)[1].strip() for line in result.stderr.splitlines() if line.startswith('import time:')}
+
+    def __median_wall_ms(self, *args):
+        times = []
+        for _ in range(STARTUP_RUNS):
+            start = time.perf_counter()
+            self.__run(*args)
+            times.append(time.perf_counter() - start)
+        return statistics.median(times) * 1000
+
+    def test_fast_start_imports(self):
+        interpreter_modules = self.__imported_modules('-c', 'pass')
+        robomars_modules = self.__imported_modules('robomars.py', TestStartup.SAMPLE_SINGLE)
+        self.assertIn('src.main_robomars', robomars_modules)
+        self.assertEqual((robomars_modules - interpreter_modules) & SLOW_START_MODULES, set())
+
+    def test_startup_budget(self):
+        interpreter_ms = self.__median_wall_ms('-c', 'pass')
+        robomars_ms = self.__median_wall_ms('robomars.py', TestStartup.SAMPLE_SINGLE)
+        self.assertLess(robomars_ms - interpreter_ms, STARTUP_OVERHEAD_BUDGET_MS)
+
+    def test_zipapp(self):
+        dir_name = self._create_dir('zipapp')
+        target = build_zipapp(os.path.join(os.path.abspath(dir_name), 'robomars.pyz'))
+        for sample in ('sample_input', 'sample_input_err_grid'):
+            sample_path = os.path.join(PROJECT_DIR, 'tests', 'testfiles', sample)
+            from_zipapp = self.__run(target, sample_path)
+            from_script = self.__run('robomars.py', sample_path)
+            self.assertEqual(
+                (from_zipapp.returncode, from_zipapp.stdout, from_zipapp.stderr),
+                (from_script.returncode, from_script.stdout, from_script.stderr))
+        interpreter_ms = self.__median_wall_ms('-c', 'pass')
+        zipapp_ms = self.__median_wall_ms(target, TestStartup.SAMPLE_SINGLE)
+        self.assertLess(zipapp_ms - interpreter_ms, STARTUP_OVERHEAD_BUDGET_MS)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import glob
+import shutil
+import tempfile
+import zipapp
+import py_compile
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TARGET = os.path.join(PROJECT_DIR, 'dist', 'robomars.pyz')
+
+
+def compile_legacy_pyc(source_path):
+    # zipimport only looks for byte code next to the source (no __pycache__), and cannot validate it against
+    # timestamps cheaply, so ship unchecked-hash .pyc files. Other Python versions fall back to the .py files.
+    py_compile.compile(
+        source_path, cfile=source_path + 'c', doraise=True,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+
+
+def build_zipapp(target=DEFAULT_TARGET):
+    with tempfile.TemporaryDirectory() as staging_dir:
+        shutil.copyfile(os.path.join(PROJECT_DIR, 'robomars.py'), os.path.join(staging_dir, '__main__.py'))
+        os.mkdir(os.path.join(staging_dir, 'src'))
+        for source_path in glob.glob(os.path.join(PROJECT_DIR, 'src', '*.py')):
+            shutil.copyfile(source_path, os.path.join(staging_dir, 'src', os.path.basename(source_path)))
+        for source_path in glob.glob(os.path.join(staging_dir, '**', '*.py'), recursive=True):
+            compile_legacy_pyc(source_path)
+        os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+        # Stored, not deflated: the archive is small, and decompressing costs start up time.
+        zipapp.create_archive(staging_dir, target, interpreter='/usr/bin/env python3', compressed=False)
+    return target
+
+
+if __name__ == "__main__":
+    print(build_zipapp(*sys.argv[1:2]))